@@ -1,6 +1,7 @@
-import requests
+import asyncio
+import functools
+import httpx
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
 from tome.command import tome_command
@@ -9,27 +10,101 @@ from tome.errors import TomeException
 from rich.console import Console
 from rich.progress import Progress
 
+# Story payloads are decoded with orjson when it is installed, else with the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+HN_MAX_CONNECTIONS = 20
+HN_MAX_RETRIES = 3
+HN_RETRY_BACKOFF = 0.2
+HN_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+PROGRESS_BATCH_SIZE = 8
+
 # --- Helper Functions ---
 
-def fetch_item(item_id):
-    """Fetches details for a single Hacker News item."""
+def _json_loads(data):
+    """Decodes a HN API response body, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+async def get_with_retries(client, url):
+    """
+    GETs a URL, retrying transient server errors with exponential backoff.
+    Connection failures are already retried by the client's transport.
+    """
+    for attempt in range(HN_MAX_RETRIES + 1):
+        response = await client.get(url)
+        if response.status_code not in HN_RETRY_STATUSES or attempt == HN_MAX_RETRIES:
+            return response
+        await asyncio.sleep(HN_RETRY_BACKOFF * (2 ** attempt))
+
+async def fetch_item(client, index, item_id):
+    """
+    Fetches details for a single Hacker News item.
+    Returns (index, item) so the caller can place the result at its original rank.
+    """
     try:
-        url = f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json"
-        response = requests.get(url, timeout=5)
+        response = await get_with_retries(client, f"{HN_API_URL}/item/{item_id}.json")
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        # Deleted items come back as JSON null
+        return index, _json_loads(response.content) or {"id": item_id, "error": "Item not found."}
+    except (httpx.HTTPError, ValueError) as e:
         # Return an error structure for this specific item
-        return {"id": item_id, "error": str(e)}
+        return index, {"id": item_id, "error": str(e)}
+
+async def fetch_top_stories(limit):
+    """
+    Fetches the top story IDs and their details concurrently.
+    All requests are multiplexed over a single HTTP/2 client.
+    """
+    # Every request goes to the same host, so this is effectively a per-host limit
+    limits = httpx.Limits(max_connections=HN_MAX_CONNECTIONS, max_keepalive_connections=HN_MAX_CONNECTIONS)
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=HN_MAX_RETRIES)
+    async with httpx.AsyncClient(transport=transport, timeout=10.0) as client:
+        # 1. Fetch top story IDs
+        response = await get_with_retries(client, f"{HN_API_URL}/topstories.json")
+        response.raise_for_status()
+        top_story_ids = _json_loads(response.content)
 
+        # 2. Fetch story details concurrently for speed
+        story_ids_to_fetch = top_story_ids[:limit]
+        # Each result is written to its rank slot because concurrency makes completion order unpredictable
+        sorted_stories = [None] * len(story_ids_to_fetch)
+
+        # Rich refreshes on its own timer, so the bar only needs to be updated in batches
+        with Progress(console=Console(stderr=True), refresh_per_second=8, auto_refresh=True) as progress:
+            task = progress.add_task("[cyan]Fetching stories...", total=len(story_ids_to_fetch))
+            pending = [fetch_item(client, index, story_id) for index, story_id in enumerate(story_ids_to_fetch)]
+            completed = 0
+            for next_done in asyncio.as_completed(pending):
+                index, story = await next_done
+                sorted_stories[index] = story
+                completed += 1
+                if completed % PROGRESS_BATCH_SIZE == 0:
+                    progress.update(task, completed=completed)
+            progress.update(task, completed=len(story_ids_to_fetch))
+
+    return sorted_stories
+
+@functools.lru_cache(maxsize=512)
 def get_domain(url_string):
     """Extracts the domain from a URL."""
     if not url_string:
         return "self.hackernews"
+    # Fast path for plain http(s) URLs: the host is the third '/'-separated field
+    if url_string.startswith(("http://", "https://")):
+        netloc = url_string.split("/", 3)[2]
+        if "?" not in netloc and "#" not in netloc:
+            return netloc[4:] if netloc.startswith("www.") else netloc
     try:
-        return urlparse(url_string).netloc.replace("www.", "")
-    except:
+        netloc = urlparse(url_string).netloc
+    except ValueError:
         return "N/A"
+    return netloc[4:] if netloc.startswith("www.") else netloc
 
 # --- Tome Command Formatters ---
 
@@ -81,7 +156,7 @@ def hn_top_json_formatter(data):
 def hn_top(tome_api, parser, *args):
     """
     Fetches the top stories from Hacker News.
-    Requires the 'requests' library to be installed.
+    Requires the 'httpx' library (with HTTP/2 support) to be installed.
     """
     parser.add_argument(
         '-l', '--limit',
@@ -95,29 +170,7 @@ def hn_top(tome_api, parser, *args):
         return {"status": "success", "stories": []} # Return empty list if limit is zero or less
 
     try:
-        # 1. Fetch top story IDs
-        top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        response = requests.get(top_stories_url, timeout=10)
-        response.raise_for_status()
-        top_story_ids = response.json()
-
-        # 2. Fetch story details concurrently for speed
-        story_ids_to_fetch = top_story_ids[:parsed_args.limit]
-        stories_details = []
-
-        with Progress(console=Console(stderr=True)) as progress:
-            task = progress.add_task("[cyan]Fetching stories...", total=len(story_ids_to_fetch))
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_id = {executor.submit(fetch_item, story_id): story_id for story_id in story_ids_to_fetch}
-                for future in as_completed(future_to_id):
-                    stories_details.append(future.result())
-                    progress.update(task, advance=1)
-        
-        # Sort results by original ranking because concurrency makes order unpredictable
-        id_map = {story['id']: story for story in stories_details}
-        sorted_stories = [id_map[story_id] for story_id in story_ids_to_fetch if story_id in id_map]
-
+        sorted_stories = asyncio.run(fetch_top_stories(parsed_args.limit))
         return {"status": "success", "stories": sorted_stories}
-
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         return {"status": "error", "error": f"Failed to connect to Hacker News API: {e}"}
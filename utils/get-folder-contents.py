@@ -1,21 +1,95 @@
 import os
+import re
 import fnmatch
 import json
 from tome.command import tome_command
 from tome.api.output import TomeOutput
 from tome.errors import TomeException
+from rich.text import Text
 
-def gfc_text_formatter(results_list):
+GLOB_CHARS = ('*', '?', '[', ']')
+READ_BUFFER_SIZE = 1 << 20
+
+def compile_patterns(patterns):
+    """
+    Compiles a list of fnmatch-style patterns into a single alternation regex.
+    Like fnmatch.fnmatch, names must be passed through os.path.normcase before matching.
+    Returns None if there are no patterns to match.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(os.path.normcase(pattern))})" for pattern in patterns))
+
+def iter_folder_contents(base_search_dir, include_re, ignore_names, ignore_re):
+    """
+    Walks base_search_dir and yields one result dict per matching file.
+    Files are read one at a time so only a single file's content is held in memory.
+    """
+    def is_glob_ignored(name_key, rel_key):
+        # Glob pattern matching against the basename first (cheap), then the full relative path
+        return ignore_re is not None and bool(ignore_re.match(name_key) or ignore_re.match(rel_key))
+
+    # Explicit scandir traversal: DirEntry caches the file type from readdir, saving a stat per entry.
+    # Relative paths are built incrementally as (absolute, relative) pairs instead of via os.path.relpath.
+    dirs_to_visit = [(base_search_dir, "")]
+    while dirs_to_visit:
+        current_dir, current_rel_dir = dirs_to_visit.pop()
+        rel_prefix = current_rel_dir + os.sep if current_rel_dir else ""
+        subdirs = []
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    # Ignored directories are never descended into, so a literal ignore
+                    # can only match the name of the entry itself, not its parents
+                    if filename in ignore_names:
+                        continue
+
+                    filepath_rel = rel_prefix + filename
+                    # Case-normalized once per entry and shared by the ignore and include checks
+                    name_key = os.path.normcase(filename)
+                    rel_key = os.path.normcase(filepath_rel)
+
+                    if entry.is_dir():
+                        # Like os.walk, symlinked directories are neither followed nor read as files
+                        if not entry.is_symlink() and not is_glob_ignored(name_key, rel_key):
+                            subdirs.append((entry.path, filepath_rel))
+                        continue
+
+                    if is_glob_ignored(name_key, rel_key):
+                        continue
+
+                    if include_re.match(rel_key) or include_re.match(name_key):
+                        try:
+                            with open(entry.path, 'r', encoding='utf-8', errors='ignore', buffering=READ_BUFFER_SIZE) as f:
+                                contents = f.read()
+                            yield {
+                                "path": filepath_rel,
+                                "content": contents,
+                                "status": "success"
+                            }
+                        except Exception as e:
+                            yield {
+                                "path": filepath_rel,
+                                "status": "error",
+                                "error": f"Could not read file: {str(e)}"
+                            }
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does by default
+            continue
+        # Push in reverse so directories are visited in listing order (same order as os.walk)
+        dirs_to_visit.extend(reversed(subdirs))
+
+def gfc_text_formatter(results):
     """
     Text formatter for get_folder_contents.
-    Prints the path and content of each found file or errors.
+    Prints the path and content of each found file or errors as they are produced.
     """
     output = TomeOutput(stdout=True)
-    if not results_list:
-        output.info("No files found matching the criteria.")
-        return
+    found_any = False
 
-    for item in results_list:
+    for item in results:
+        found_any = True
         if item.get("status") == "error":
             TomeOutput().error(f"Error processing {item.get('path', 'Unknown path')}: {item.get('error')}")
         elif "path" in item and "content" in item:
@@ -25,13 +99,26 @@ def gfc_text_formatter(results_list):
             output.print(item['content'])
             output.print("--------------\n")
 
-def gfc_json_formatter(results_list):
+    if not found_any:
+        output.info("No files found matching the criteria.")
+
+def gfc_json_formatter(results):
     """
     JSON formatter for get_folder_contents.
-    Prints the list of file data (or errors) as JSON.
+    Streams the list of file data (or errors) as a JSON array, one item at a time.
     """
     output = TomeOutput(stdout=True)
-    output.print_json(json.dumps(results_list, indent=2))
+    output.print("[")
+    # Each item is printed once the next one is known, so its separator goes on the same line.
+    # Wrapping it in Text keeps Rich from interpreting markup or emoji codes in file contents.
+    previous_item = None
+    for item in results:
+        if previous_item is not None:
+            output.print(Text(json.dumps(previous_item) + ","))
+        previous_item = item
+    if previous_item is not None:
+        output.print(Text(json.dumps(previous_item)))
+    output.print("]")
 
 @tome_command(formatters={"text": gfc_text_formatter, "json": gfc_json_formatter})
 def get_folder_contents(tome_api, parser, *args):
@@ -50,64 +137,13 @@ def get_folder_contents(tome_api, parser, *args):
     )
     parsed_args = parser.parse_args(*args)
 
-    output_files_data = []
-
-    def is_ignored(current_path, ignore_patterns):
-        # Normalize path for consistent matching
-        normalized_path = os.path.normpath(current_path)
-        path_parts = normalized_path.split(os.sep)
-        
-        for pattern in ignore_patterns:
-            # Direct name match in any part of the path (for simple names like 'node_modules')
-            if not any(c in pattern for c in ['*', '?', '[', ']']): # Not a glob pattern
-                if pattern in path_parts:
-                    return True
-            # Glob pattern matching against the full path or basename
-            elif fnmatch.fnmatch(normalized_path, pattern) or \
-                 fnmatch.fnmatch(os.path.basename(normalized_path), pattern):
-                return True
-        return False
+    # Simple names like 'node_modules' are compared by name, globs and paths via one regex
+    ignore_names = {p for p in parsed_args.ignore if not any(c in p for c in GLOB_CHARS + ('/', os.sep))}
+    ignore_re = compile_patterns([p for p in parsed_args.ignore if p not in ignore_names])
+    include_re = compile_patterns(parsed_args.patterns)
 
     base_search_dir = os.path.abspath(parsed_args.base_dir)
     if not os.path.isdir(base_search_dir):
         raise TomeException(f"Base directory not found or is not a directory: {base_search_dir}")
 
-    for root, dirs, files in os.walk(base_search_dir, topdown=True):
-        # Filter out ignored directories before os.walk descends into them
-        # os.walk requires modifying dirs[:] in-place
-        dirs[:] = [d for d in dirs if not is_ignored(os.path.relpath(os.path.join(root, d), base_search_dir), parsed_args.ignore)]
-
-        for filename in files:
-            filepath_abs = os.path.join(root, filename)
-            filepath_rel = os.path.relpath(filepath_abs, base_search_dir)
-
-            if is_ignored(filepath_rel, parsed_args.ignore):
-                continue
-
-            matched_by_pattern = False
-            for pattern in parsed_args.patterns:
-                if fnmatch.fnmatch(filepath_rel, pattern) or fnmatch.fnmatch(filename, pattern):
-                    matched_by_pattern = True
-                    break
-            
-            if matched_by_pattern:
-                try:
-                    with open(filepath_abs, 'r', encoding='utf-8', errors='ignore') as f:
-                        contents = f.read()
-                    output_files_data.append({
-                        "path": filepath_rel,
-                        "content": contents,
-                        "status": "success"
-                    })
-                except Exception as e:
-                    output_files_data.append({
-                        "path": filepath_rel,
-                        "status": "error",
-                        "error": f"Could not read file: {str(e)}"
-                    })
-    
-    if not output_files_data and parsed_args.patterns:
-         pass
-
-
-    return output_files_data
+    return iter_folder_contents(base_search_dir, include_re, ignore_names, ignore_re)
@@ -1,25 +1,71 @@
 import os
+import hashlib
+import tempfile
 import fnmatch 
 import json
 import re
 import requests 
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 from tome.command import tome_command
 from tome.api.output import TomeOutput
 from tome.errors import TomeException
 
+# orjson, if installed, decodes the issue and comment payloads faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared session so consecutive GitHub API calls reuse the same pooled connection.
+# Transient server errors are retried with exponential backoff on the already warm connection;
+# once retries are exhausted the last response is returned so raise_for_status reports it.
+# Rate limits (429) are not transient and fail at once, and Retry-After is ignored so a
+# long server-requested wait can never stall the command.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=False,
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_connections=20, pool_maxsize=20))
+
+_GITHUB_URL_PREFIX = "https://github.com/"
+_ISSUE_PATH_RE = re.compile(r'/([^/]+)/([^/]+)/issues/(\d+)/?$')
+
+# Upper bound on concurrent requests when fetching the remaining pages of a collection
+_MAX_PAGE_WORKERS = 8
+
+# Responses are cached on disk with their ETag so unchanged resources come back as cheap 304s.
+# Set TOME_GITHUB_NO_CACHE=1 to disable the cache; delete the directory to clear it.
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tome", "github")
+_CACHE_MAX_BYTES = 100 * 1024 * 1024
+_CACHE_ENABLED = not os.environ.get("TOME_GITHUB_NO_CACHE")
 
 def parse_github_issue_url(url):
     """
     Parses a GitHub issue URL to extract owner, repo, and issue number.
     """
+    # Fast path for canonical URLs: match the path directly without a full urlparse
+    if url.startswith(_GITHUB_URL_PREFIX):
+        path = url[len(_GITHUB_URL_PREFIX) - 1:].split('?', 1)[0].split('#', 1)[0]
+        match = _ISSUE_PATH_RE.match(path)
+        if match:
+            owner, repo, issue_number_str = match.groups()
+            return {"owner": owner, "repo": repo, "issue_number": int(issue_number_str)}
+
     parsed_url = urlparse(url)
     if parsed_url.netloc.lower() != 'github.com':
         raise ValueError(f"URL must be from github.com, but received: '{parsed_url.netloc}'")
     
-    match = re.match(r'/([^/]+)/([^/]+)/issues/(\d+)/?$', parsed_url.path)
+    match = _ISSUE_PATH_RE.match(parsed_url.path)
     if not match:
         raise ValueError("Invalid URL format. Expected '/<owner>/<repo>/issues/<issue_number>'.")
     
@@ -28,17 +74,132 @@ def parse_github_issue_url(url):
 
 def format_github_timestamp(timestamp_str):
     """Converts GitHub ISO 8601 timestamp to a readable format."""
+    # GitHub always sends 'YYYY-MM-DDTHH:MM:SSZ'; rewrite it by slicing and only parse anything else
+    if len(timestamp_str) == 20 and timestamp_str[10] == 'T' and timestamp_str[19] == 'Z':
+        return f"{timestamp_str[:10]} {timestamp_str[11:19]} UTC"
     try:
         dt_object = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
         return dt_object.strftime('%Y-%m-%d %H:%M:%S UTC')
     except ValueError:
         return timestamp_str 
 
-def _fetch_github_api(url, headers, params=None):
-    """Helper function for GET requests to GitHub API."""
+def _cache_path(url, params, accept_header):
+    """Returns the file used to cache a GitHub API request."""
+    key = hashlib.sha256(f"{url}|{sorted((params or {}).items())}|{accept_header}".encode("utf-8")).hexdigest()
+    return os.path.join(_CACHE_DIR, key)
+
+def _load_cache_entry(cache_path):
+    """
+    Loads a cached response as (metadata, body), or None if missing or unreadable.
+    Each entry is a single file: one line of JSON metadata followed by the raw body.
+    """
     try:
-        response = requests.get(url, headers=headers, params=params)
+        with open(cache_path, 'rb') as f:
+            metadata_line, _, body = f.read().partition(b"\n")
+        return json.loads(metadata_line), body
+    except (OSError, ValueError):
+        return None
+
+def _evict_cache_entries():
+    """Removes the least recently used entries once the cache grows beyond _CACHE_MAX_BYTES."""
+    entries = []
+    with os.scandir(_CACHE_DIR) as it:
+        for entry in it:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= _CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+
+def _store_cache_entry(cache_path, response):
+    """
+    Persists a response body and its validators. The entry is written to a private
+    temporary file and renamed into place, so readers never see a partial entry.
+    Caching is best effort.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    metadata = json.dumps({
+        "etag": etag,
+        "last_modified": last_modified,
+        "status": response.status_code,
+        "link": response.headers.get("Link")
+    }).encode("utf-8")
+    try:
+        # Entries can hold private repository data, so keep them readable by the owner only
+        os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(metadata + b"\n")
+                f.write(response.content)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+        _evict_cache_entries()
+    except OSError:
+        pass
+
+def _touch_cache_entry(cache_path):
+    """Marks an entry as recently used so eviction keeps it."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+def _restore_cached_response(response, metadata, body):
+    """Turns a 304 Not Modified response into the cached response it stands for."""
+    # A 304 has no body; release the connection in case the request was streamed
+    response.close()
+    response._content = body
+    response.status_code = metadata["status"]
+    response.encoding = "utf-8"
+    # Pagination may have changed even if this page did not, so prefer the 304's own Link
+    if metadata.get("link") and "Link" not in response.headers:
+        response.headers["Link"] = metadata["link"]
+    return response
+
+def _json_loads(data):
+    """Parses raw response bytes as JSON (orjson if available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _fetch_github_api(url, params=None, use_cache=True):
+    """
+    Helper function for GET requests to GitHub API using the shared session.
+    With use_cache=False the on-disk cache is neither consulted nor updated.
+    """
+    request_headers = {}
+    cache_path = _cache_path(url, params, _SESSION.headers.get("Accept")) if _CACHE_ENABLED and use_cache else None
+    cache_entry = _load_cache_entry(cache_path) if cache_path else None
+    if cache_entry:
+        metadata, _ = cache_entry
+        if metadata.get("etag"):
+            request_headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            request_headers["If-Modified-Since"] = metadata["last_modified"]
+
+    try:
+        response = _SESSION.get(url, headers=request_headers, params=params)
+        if response.status_code == 304 and cache_entry:
+            _touch_cache_entry(cache_path)
+            return _restore_cached_response(response, *cache_entry)
         response.raise_for_status() 
+        if cache_path:
+            _store_cache_entry(cache_path, response)
         return response
     except requests.exceptions.HTTPError as http_err:
         error_message = f"HTTP error occurred: {http_err}"
@@ -53,24 +214,50 @@ def _fetch_github_api(url, headers, params=None):
         raise TomeException(f"Request error occurred: {req_err}") from req_err
 
 
+def _fetch_github_api_all_pages(url, params=None):
+    """
+    Fetches every page of a paginated GitHub API collection and returns the combined list.
+    The page count is read from the 'last' Link header and the remaining pages are fetched concurrently.
+    """
+    params = dict(params or {})
+    # The first page is always fetched fresh: its Link header is what tells us how many pages
+    # there are now, and a cached copy could hide pages added since it was stored
+    first_response = _fetch_github_api(url, params=params, use_cache=False)
+    items = _json_loads(first_response.content)
+
+    last_url = first_response.links.get("last", {}).get("url")
+    if not last_url:
+        return items
+    last_page = int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+    if last_page < 2:
+        return items
+
+    pages = range(2, last_page + 1)
+    with ThreadPoolExecutor(max_workers=min(_MAX_PAGE_WORKERS, len(pages))) as executor:
+        responses = executor.map(lambda page: _fetch_github_api(url, params={**params, "page": page}), pages)
+        for response in responses:
+            items.extend(_json_loads(response.content))
+    return items
+
+
 def fetch_formatted_issue_conversation(owner, repo, issue_number, token):
     """
     Fetches and formats a GitHub issue conversation.
     Returns a dictionary with 'status' and 'data' or 'error'.
     """
     base_url = "https://api.github.com"
-    headers = {
+    _SESSION.headers.update({
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github.v3+json",
         "X-GitHub-Api-Version": "2022-11-28"
-    }
+    })
     output_lines = []
     warnings = []
 
     issue_url_api = f"{base_url}/repos/{owner}/{repo}/issues/{issue_number}"
     try:
-        response_issue = _fetch_github_api(issue_url_api, headers)
-        issue_data = response_issue.json()
+        response_issue = _fetch_github_api(issue_url_api)
+        issue_data = _json_loads(response_issue.content)
     except TomeException as e:
         return {"status": "error", "error": f"Failed to fetch issue details: {str(e)}"}
 
@@ -91,11 +278,7 @@ def fetch_formatted_issue_conversation(owner, repo, issue_number, token):
     comments_url_api = issue_data.get('comments_url')
     if comments_url_api:
         try:
-            response_comments = _fetch_github_api(comments_url_api, headers, params={'per_page': 100})
-            comments_data = response_comments.json()
-            if 'next' in response_comments.links:
-                warnings.append("WARNING: More comments exist than retrieved (pagination not fully implemented for >100 comments).")
-
+            comments_data = _fetch_github_api_all_pages(comments_url_api, params={'per_page': 100})
             if comments_data:
                 output_lines.append("\nCOMMENTS:\n")
                 for comment in comments_data:
@@ -106,8 +289,8 @@ def fetch_formatted_issue_conversation(owner, repo, issue_number, token):
                     output_lines.append("-" * 40)
                     output_lines.append(comment.get('body') or "No comment body.")
                     output_lines.append("-" * 40)
-            elif response_comments.ok :
-                 output_lines.append("\nNo comments found for this issue.")
+            else:
+                output_lines.append("\nNo comments found for this issue.")
         except TomeException as e:
             warnings.append(f"WARNING: Could not retrieve comments: {str(e)}")
             output_lines.append("\nCould not retrieve comments.")
@@ -1,23 +1,98 @@
 import os
+import hashlib
+import tempfile
 import json
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 from tome.command import tome_command
 from tome.api.output import TomeOutput
 from tome.errors import TomeException
 
+# Optional faster decoder for the PR and comment payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared session so consecutive GitHub API calls reuse the same pooled connection.
+# Transient server errors are retried with exponential backoff on the already warm connection;
+# once retries are exhausted the last response is returned so raise_for_status reports it.
+# Rate limits (429) are not transient and fail at once, and Retry-After is ignored so a
+# long server-requested wait can never stall the command.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=False,
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_connections=20, pool_maxsize=20))
+
+_GITHUB_URL_PREFIX = "https://github.com/"
+_PR_PATH_RE = re.compile(r'/([^/]+)/([^/]+)/pull/(\d+)/?$')
+
+# One GraphQL query returns the PR metadata and both comment threads. The diff is not
+# exposed through GraphQL, so it is always fetched from the REST API.
+_GRAPHQL_URL = "https://api.github.com/graphql"
+_PR_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      url title body state createdAt updatedAt mergedAt baseRefName headRefName
+      author { __typename login }
+      comments(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { author { __typename login } createdAt body }
+      }
+      reviews(first: 100) {
+        pageInfo { hasNextPage }
+        nodes {
+          comments(first: 100) {
+            pageInfo { hasNextPage }
+            nodes { author { __typename login } createdAt body path line originalLine }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+_GRAPHQL_PR_STATES = {"OPEN": "open", "CLOSED": "closed", "MERGED": "closed"}
+
+# Upper bound on concurrent requests when fetching the remaining pages of a collection
+_MAX_PAGE_WORKERS = 8
+
+# Responses are cached on disk with their ETag so unchanged resources come back as cheap 304s.
+# Set TOME_GITHUB_NO_CACHE=1 to disable the cache; delete the directory to clear it.
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tome", "github")
+_CACHE_MAX_BYTES = 100 * 1024 * 1024
+_CACHE_ENABLED = not os.environ.get("TOME_GITHUB_NO_CACHE")
+
 def parse_github_pr_url(url):
     """
     Parses a GitHub PR URL to extract owner, repo, and PR number.
     """
+    # Fast path for canonical URLs: match the path directly without a full urlparse
+    if url.startswith(_GITHUB_URL_PREFIX):
+        path = url[len(_GITHUB_URL_PREFIX) - 1:].split('?', 1)[0].split('#', 1)[0]
+        match = _PR_PATH_RE.match(path)
+        if match:
+            owner, repo, pr_number_str = match.groups()
+            return {"owner": owner, "repo": repo, "pr_number": int(pr_number_str)}
+
     parsed_url = urlparse(url)
     if parsed_url.netloc.lower() != 'github.com':
         raise ValueError(f"URL must be from github.com, but received: '{parsed_url.netloc}'")
     
-    match = re.match(r'/([^/]+)/([^/]+)/pull/(\d+)/?$', parsed_url.path)
+    match = _PR_PATH_RE.match(parsed_url.path)
     if not match:
         raise ValueError("Invalid PR URL format. Expected '/<owner>/<repo>/pull/<pr_number>'.")
     
@@ -27,21 +102,135 @@ def parse_github_pr_url(url):
 def format_github_timestamp(timestamp_str):
     """Converts GitHub ISO 8601 timestamp to a readable format."""
     if not timestamp_str: return "N/A"
+    # GitHub always sends 'YYYY-MM-DDTHH:MM:SSZ'; rewrite it by slicing and only parse anything else
+    if len(timestamp_str) == 20 and timestamp_str[10] == 'T' and timestamp_str[19] == 'Z':
+        return f"{timestamp_str[:10]} {timestamp_str[11:19]} UTC"
     try:
         dt_object = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
         return dt_object.strftime('%Y-%m-%d %H:%M:%S UTC')
     except ValueError:
         return timestamp_str
 
-def _fetch_github_api(url, headers, params=None, accept_header=None):
-    """Helper function for GET requests to GitHub API."""
-    request_headers = headers.copy()
+def _cache_path(url, params, accept_header):
+    """Returns the file used to cache a GitHub API request."""
+    key = hashlib.sha256(f"{url}|{sorted((params or {}).items())}|{accept_header}".encode("utf-8")).hexdigest()
+    return os.path.join(_CACHE_DIR, key)
+
+def _load_cache_entry(cache_path):
+    """
+    Loads a cached response as (metadata, body), or None if missing or unreadable.
+    Each entry is a single file: one line of JSON metadata followed by the raw body.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            metadata_line, _, body = f.read().partition(b"\n")
+        return json.loads(metadata_line), body
+    except (OSError, ValueError):
+        return None
+
+def _evict_cache_entries():
+    """Removes the least recently used entries once the cache grows beyond _CACHE_MAX_BYTES."""
+    entries = []
+    with os.scandir(_CACHE_DIR) as it:
+        for entry in it:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= _CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+
+def _store_cache_entry(cache_path, response):
+    """
+    Persists a response body and its validators. The entry is written to a private
+    temporary file and renamed into place, so readers never see a partial entry.
+    Caching is best effort.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    metadata = json.dumps({
+        "etag": etag,
+        "last_modified": last_modified,
+        "status": response.status_code,
+        "link": response.headers.get("Link")
+    }).encode("utf-8")
+    try:
+        # Entries can hold private repository data, so keep them readable by the owner only
+        os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(metadata + b"\n")
+                f.write(response.content)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+        _evict_cache_entries()
+    except OSError:
+        pass
+
+def _touch_cache_entry(cache_path):
+    """Marks an entry as recently used so eviction keeps it."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+def _restore_cached_response(response, metadata, body):
+    """Turns a 304 Not Modified response into the cached response it stands for."""
+    # A 304 has no body; release the connection in case the request was streamed
+    response.close()
+    response._content = body
+    response.status_code = metadata["status"]
+    response.encoding = "utf-8"
+    # Pagination may have changed even if this page did not, so prefer the 304's own Link
+    if metadata.get("link") and "Link" not in response.headers:
+        response.headers["Link"] = metadata["link"]
+    return response
+
+def _json_loads(data):
+    """Parses a GitHub response body; uses orjson when importable."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _fetch_github_api(url, params=None, accept_header=None, stream=False, use_cache=True):
+    """
+    Helper function for GET requests to GitHub API using the shared session.
+    With stream=True the body is only read when response.content is accessed.
+    With use_cache=False the on-disk cache is neither consulted nor updated.
+    """
+    request_headers = {}
     if accept_header:
         request_headers["Accept"] = accept_header
-    
+    cache_path = _cache_path(url, params, accept_header or _SESSION.headers.get("Accept")) if _CACHE_ENABLED and use_cache else None
+    cache_entry = _load_cache_entry(cache_path) if cache_path else None
+    if cache_entry:
+        metadata, _ = cache_entry
+        if metadata.get("etag"):
+            request_headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            request_headers["If-Modified-Since"] = metadata["last_modified"]
+
     try:
-        response = requests.get(url, headers=request_headers, params=params)
+        response = _SESSION.get(url, headers=request_headers, params=params, stream=stream)
+        if response.status_code == 304 and cache_entry:
+            _touch_cache_entry(cache_path)
+            return _restore_cached_response(response, *cache_entry)
         response.raise_for_status() 
+        if cache_path:
+            _store_cache_entry(cache_path, response)
         return response
     except requests.exceptions.HTTPError as http_err:
         error_message = f"HTTP error occurred while fetching {url}: {http_err}"
@@ -55,56 +244,173 @@ def _fetch_github_api(url, headers, params=None, accept_header=None):
     except requests.exceptions.RequestException as req_err:
         raise TomeException(f"Request error occurred while fetching {url}: {req_err}") from req_err
 
+def _fetch_github_api_all_pages(url, params=None, accept_header=None):
+    """
+    Fetches every page of a paginated GitHub API collection and returns the combined list.
+    The page count is read from the 'last' Link header and the remaining pages are fetched concurrently.
+    """
+    params = dict(params or {})
+    # The first page is always fetched fresh: its Link header is what tells us how many pages
+    # there are now, and a cached copy could hide pages added since it was stored
+    first_response = _fetch_github_api(url, params=params, accept_header=accept_header, use_cache=False)
+    items = _json_loads(first_response.content)
+
+    last_url = first_response.links.get("last", {}).get("url")
+    if not last_url:
+        return items
+    last_page = int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+    if last_page < 2:
+        return items
+
+    pages = range(2, last_page + 1)
+    with ThreadPoolExecutor(max_workers=min(_MAX_PAGE_WORKERS, len(pages))) as executor:
+        responses = executor.map(
+            lambda page: _fetch_github_api(url, params={**params, "page": page}, accept_header=accept_header),
+            pages
+        )
+        for response in responses:
+            items.extend(_json_loads(response.content))
+    return items
+
+def _graphql_user(node):
+    """
+    Returns the REST-style 'user' object for a GraphQL node's author.
+    GraphQL drops the '[bot]' suffix from app logins and returns no author for deleted
+    accounts; REST reports those as 'name[bot]' and 'ghost', so map them back.
+    """
+    author = node.get('author')
+    if not author:
+        return {"login": "ghost"}
+    if author.get('__typename') == "Bot":
+        return {"login": f"{author['login']}[bot]"}
+    return {"login": author['login']}
+
+def _fetch_pr_data_graphql(owner, repo, pr_number):
+    """
+    Fetches PR details, general comments and review comments with a single GraphQL request.
+    Returns (pr_data, pr_comments_data, review_comments_data) shaped like the REST responses,
+    or None if the query fails or any collection spans more than one page, so the caller can
+    fall back to the paginated REST endpoints.
+    """
+    variables = {"owner": owner, "name": repo, "number": pr_number}
+    try:
+        response = _SESSION.post(_GRAPHQL_URL, json={"query": _PR_GRAPHQL_QUERY, "variables": variables})
+        response.raise_for_status()
+        payload = _json_loads(response.content)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+    pr = ((payload.get('data') or {}).get('repository') or {}).get('pullRequest')
+    if payload.get('errors') or not pr:
+        return None
+    reviews = pr['reviews']
+    if pr['comments']['pageInfo']['hasNextPage'] or reviews['pageInfo']['hasNextPage'] or \
+       any(review['comments']['pageInfo']['hasNextPage'] for review in reviews['nodes']):
+        return None
+
+    pr_data = {
+        "html_url": pr['url'],
+        "title": pr['title'],
+        "state": _GRAPHQL_PR_STATES.get(pr['state'], pr['state'].lower()),
+        "user": _graphql_user(pr),
+        "created_at": pr['createdAt'],
+        "updated_at": pr['updatedAt'],
+        "merged_at": pr['mergedAt'],
+        "body": pr['body'],
+        "base": {"ref": pr['baseRefName']},
+        "head": {"ref": pr['headRefName']},
+    }
+    pr_comments_data = [
+        {"user": _graphql_user(c), "created_at": c['createdAt'], "body": c['body']}
+        for c in pr['comments']['nodes']
+    ]
+    review_comments_data = sorted(
+        (
+            {
+                "user": _graphql_user(rc),
+                "path": rc['path'],
+                "line": rc['line'],
+                "original_line": rc['originalLine'],
+                "created_at": rc['createdAt'],
+                "body": rc['body'],
+            }
+            for review in reviews['nodes'] for rc in review['comments']['nodes']
+        ),
+        key=lambda rc: rc['created_at']
+    )
+    return pr_data, pr_comments_data, review_comments_data
+
 def fetch_formatted_pr_data(owner, repo, pr_number, token):
     """
     Fetches and formats GitHub PR details, comments, and diff.
     Returns a dictionary.
     """
     base_url = "https://api.github.com"
-    std_headers = {
+    json_accept_header = "application/vnd.github.v3+json" 
+    _SESSION.headers.update({
         "Authorization": f"Bearer {token}",
+        "Accept": json_accept_header,
         "X-GitHub-Api-Version": "2022-11-28"
-    }
-    json_accept_header = "application/vnd.github.v3+json" 
+    })
     diff_accept_header = "application/vnd.github.v3.diff"
 
-    pr_data = {}
     pr_comments_data = []
     review_comments_data = []
     diff_text = ""
     warnings = []
 
     pr_api_url = f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
-    try:
-        response_pr = _fetch_github_api(pr_api_url, std_headers, accept_header=json_accept_header)
-        pr_data = response_pr.json()
-    except TomeException as e:
-        return {"action": "get_pr", "status": "error", "error": f"Failed to fetch PR details: {str(e)}"}
-
     issue_comments_api_url = f"{base_url}/repos/{owner}/{repo}/issues/{pr_number}/comments"
-    try:
-        response_issue_comments = _fetch_github_api(issue_comments_api_url, std_headers, params={'per_page': 100}, accept_header=json_accept_header)
-        pr_comments_data = response_issue_comments.json()
-        if 'next' in response_issue_comments.links:
-            warnings.append("WARNING: More general PR comments exist than retrieved (pagination not fully implemented).")
-    except TomeException as e:
-        warnings.append(f"WARNING: Could not retrieve general PR comments: {str(e)}")
-
     review_comments_api_url = f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}/comments"
-    try:
-        response_review_comments = _fetch_github_api(review_comments_api_url, std_headers, params={'per_page': 100}, accept_header=json_accept_header)
-        review_comments_data = response_review_comments.json()
-        if 'next' in response_review_comments.links:
-            warnings.append("WARNING: More review comments exist than retrieved (pagination not fully implemented).")
-    except TomeException as e:
-        warnings.append(f"WARNING: Could not retrieve review comments: {str(e)}")
 
-    try:
-        response_diff = _fetch_github_api(pr_api_url, std_headers, accept_header=diff_accept_header)
-        diff_text = response_diff.text
-    except TomeException as e:
-        warnings.append(f"WARNING: Could not retrieve PR diff: {str(e)}")
+    # The diff is only printed, so stream the raw bytes instead of letting requests sniff a charset.
+    diff_request_kwargs = {"accept_header": diff_accept_header, "stream": True}
+    rest_requests = {
+        "pr": (_fetch_github_api, pr_api_url, {"accept_header": json_accept_header}),
+        "issue_comments": (_fetch_github_api_all_pages, issue_comments_api_url, {"params": {'per_page': 100}, "accept_header": json_accept_header}),
+        "review_comments": (_fetch_github_api_all_pages, review_comments_api_url, {"params": {'per_page': 100}, "accept_header": json_accept_header}),
+    }
+    responses = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(rest_requests) + 1) as executor:
+        future_to_key = {executor.submit(_fetch_github_api, pr_api_url, **diff_request_kwargs): "diff"}
+        # Runs while the diff downloads; if it cannot provide everything, fall back to the
+        # independent REST requests, issued concurrently over the shared session
+        graphql_data = _fetch_pr_data_graphql(owner, repo, pr_number)
+        if graphql_data is None:
+            future_to_key.update({
+                executor.submit(fetch_function, url, **request_kwargs): key
+                for key, (fetch_function, url, request_kwargs) in rest_requests.items()
+            })
+        for future in as_completed(future_to_key):
+            key = future_to_key[future]
+            try:
+                responses[key] = future.result()
+            except TomeException as e:
+                errors[key] = e
+
+    if graphql_data is not None:
+        pr_data, pr_comments_data, review_comments_data = graphql_data
+    else:
+        if "pr" in errors:
+            return {"action": "get_pr", "status": "error", "error": f"Failed to fetch PR details: {str(errors['pr'])}"}
+        pr_data = _json_loads(responses["pr"].content)
+
+        if "issue_comments" in errors:
+            warnings.append(f"WARNING: Could not retrieve general PR comments: {str(errors['issue_comments'])}")
+        else:
+            pr_comments_data = responses["issue_comments"]
+
+        if "review_comments" in errors:
+            warnings.append(f"WARNING: Could not retrieve review comments: {str(errors['review_comments'])}")
+        else:
+            review_comments_data = responses["review_comments"]
+
+    if "diff" in errors:
+        warnings.append(f"WARNING: Could not retrieve PR diff: {str(errors['diff'])}")
         diff_text = "Error retrieving diff."
+    else:
+        diff_text = responses["diff"].content.decode("utf-8", "replace")
 
     return {
         "action": "get_pr",
@@ -152,48 +458,52 @@ def gpr_text_formatter(data):
     for warning_msg in data.get("warnings", []):
         error_output.warning(warning_msg)
     
+    lines = []
     details = data.get("pr_details", {})
-    output.print(f"GitHub Pull Request: {details.get('url', 'N/A')}")
-    output.print(f"Title: {details.get('title', 'N/A')}")
-    output.print(f"Author: @{details.get('author', 'N/A')}")
-    output.print(f"State: {details.get('state', 'N/A')}")
-    output.print(f"Created: {details.get('created_at', 'N/A')}")
+    lines.append(f"GitHub Pull Request: {details.get('url', 'N/A')}")
+    lines.append(f"Title: {details.get('title', 'N/A')}")
+    lines.append(f"Author: @{details.get('author', 'N/A')}")
+    lines.append(f"State: {details.get('state', 'N/A')}")
+    lines.append(f"Created: {details.get('created_at', 'N/A')}")
     if details.get('merged_at') and details.get('merged_at') != "N/A":
-        output.print(f"Merged: {details.get('merged_at')}")
-    output.print(f"Base: {details.get('base_ref', 'N/A')} <- Head: {details.get('head_ref', 'N/A')}")
-    output.print("-" * 40)
-    output.print("PR DESCRIPTION:")
-    output.print(details.get('body', "No description provided."))
-    output.print("=" * 40)
+        lines.append(f"Merged: {details.get('merged_at')}")
+    lines.append(f"Base: {details.get('base_ref', 'N/A')} <- Head: {details.get('head_ref', 'N/A')}")
+    lines.append("-" * 40)
+    lines.append("PR DESCRIPTION:")
+    lines.append(details.get('body', "No description provided."))
+    lines.append("=" * 40)
 
     pr_comments = data.get("pr_comments", [])
     if pr_comments:
-        output.print("\nGENERAL PR COMMENTS:\n")
+        lines.append("\nGENERAL PR COMMENTS:\n")
         for comment in pr_comments:
-            output.print("-" * 40)
-            output.print(f"Comment by @{comment['author']} on {comment['created_at']}")
-            output.print("-" * 40)
-            output.print(comment['body'])
-            output.print("-" * 40)
+            lines.append("-" * 40)
+            lines.append(f"Comment by @{comment['author']} on {comment['created_at']}")
+            lines.append("-" * 40)
+            lines.append(comment['body'])
+            lines.append("-" * 40)
     else:
-        output.print("\nNo general PR comments found.")
-    output.print("=" * 40)
+        lines.append("\nNo general PR comments found.")
+    lines.append("=" * 40)
 
     review_comments = data.get("review_comments", [])
     if review_comments:
-        output.print("\nREVIEW COMMENTS (ON DIFF):\n")
+        lines.append("\nREVIEW COMMENTS (ON DIFF):\n")
         for r_comment in review_comments:
-            output.print("-" * 40)
-            output.print(f"Comment by @{r_comment['author']} on {r_comment['created_at']}")
-            output.print(f"File: {r_comment['path']}, Line: {r_comment['line']}")
-            output.print("-" * 40)
-            output.print(r_comment['body'])
-            output.print("-" * 40)
+            lines.append("-" * 40)
+            lines.append(f"Comment by @{r_comment['author']} on {r_comment['created_at']}")
+            lines.append(f"File: {r_comment['path']}, Line: {r_comment['line']}")
+            lines.append("-" * 40)
+            lines.append(r_comment['body'])
+            lines.append("-" * 40)
     else:
-        output.print("\nNo review comments found on the diff.")
-    output.print("=" * 40)
+        lines.append("\nNo review comments found on the diff.")
+    lines.append("=" * 40)
+
+    lines.append("\nCODE DIFF:\n")
 
-    output.print("\nCODE DIFF:\n")
+    # Emit everything but the diff as one write; the diff is already a single (possibly large) string
+    output.print("\n".join(lines))
     output.print(data.get("diff", "No diff available or error retrieving diff."))
 
 